@@ -0,0 +1,79 @@
+"""
+GraphQL schema extensions for Business Backend.
+
+Provides an in-memory response cache for read-only operations so that
+identical queries (same document + variables) within a short TTL are
+served without re-planning and re-executing SQL.
+"""
+
+import hashlib
+import json
+import time
+from typing import Any
+
+from loguru import logger
+from strawberry.extensions import SchemaExtension
+
+# TTL (seconds) per top-level field. Fields not listed here fall back to
+# DEFAULT_TTL; a TTL of 0 disables caching for operations using the field.
+FIELD_TTLS: dict[str, float] = {
+    "products": 60.0,
+    "productsConnection": 60.0,
+    "searchProducts": 5.0,
+    "semanticSearch": 0.0,  # LLM answers should never be served stale
+    "processProductImage": 0.0,
+}
+
+DEFAULT_TTL = 30.0
+
+
+class ResponseCache(SchemaExtension):
+    """
+    Caches full GraphQL responses in memory keyed by query + variables.
+
+    Only successful query operations are cached; mutations and
+    operations touching zero-TTL fields always execute.
+    """
+
+    _cache: dict[str, tuple[float, Any]] = {}
+    _max_entries = 512
+
+    def on_execute(self):
+        ctx = self.execution_context
+
+        ttl = self._ttl_for(ctx.query or "")
+        key = None
+
+        if ttl > 0 and ctx.query and "mutation" not in ctx.query.split("{", 1)[0]:
+            key = self._cache_key(ctx.query, ctx.variables)
+            cached = self._cache.get(key)
+            if cached is not None:
+                expires_at, result = cached
+                if time.monotonic() < expires_at:
+                    logger.debug("⚡ GraphQL response cache hit")
+                    ctx.result = result
+                    yield
+                    return
+                del self._cache[key]
+
+        yield
+
+        if (
+            key is not None
+            and ctx.result is not None
+            and not ctx.result.errors
+        ):
+            if len(self._cache) >= self._max_entries:
+                self._cache.clear()
+            self._cache[key] = (time.monotonic() + ttl, ctx.result)
+
+    @staticmethod
+    def _cache_key(query: str, variables: dict[str, Any] | None) -> str:
+        raw = query + json.dumps(variables or {}, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @staticmethod
+    def _ttl_for(query: str) -> float:
+        """Pick the most conservative TTL among fields named in the query."""
+        ttls = [ttl for field, ttl in FIELD_TTLS.items() if field in query]
+        return min(ttls) if ttls else DEFAULT_TTL
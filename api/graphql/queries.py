@@ -5,6 +5,8 @@ This module exposes FAQs, Documents, and Products via GraphQL.
 Products and images are read from PostgreSQL database.
 """
 
+import base64
+import dataclasses
 from typing import Annotated
 from uuid import UUID
 from api.graphql.types import OCRInput, OCRResult
@@ -14,20 +16,96 @@ import strawberry
 from aioinject import Inject
 from aioinject.ext.strawberry import inject
 from loguru import logger
+from strawberry.utils.str_converters import to_snake_case
 
 from api.graphql.types import (
     FAQ,
     Document,
+    ProductStockConnection,
+    ProductStockEdge,
     ProductStockType,
     ProductSummaryType,
     SemanticSearchResponse,
     ProductImageType,
 )
+from services import faq_matcher
 from services.product_service import ProductService
 from services.search_service import SearchService
 from services.tenant_data_service import TenantDataService
 
 
+# ORM column names match the GraphQL type 1:1, so the mapping can be a
+# single precomputed loop instead of ~25 hand-written keyword arguments
+# repeated at every construction site.
+_PRODUCT_FIELDS = tuple(
+    f.name for f in dataclasses.fields(ProductStockType) if f.name != "images"
+)
+_PRODUCT_FIELD_SET = frozenset(_PRODUCT_FIELDS)
+
+
+def _to_product_type(p, images, field_names=_PRODUCT_FIELDS) -> ProductStockType:
+    """
+    Map an ORM ProductStock row (+ its images) onto the GraphQL type.
+
+    Only `field_names` are copied from the row; the rest are filled with
+    None, which Strawberry never serializes for unselected fields.
+    """
+    values = dict.fromkeys(_PRODUCT_FIELDS)
+    for name in field_names:
+        values[name] = getattr(p, name)
+    return ProductStockType(
+        images=[
+            ProductImageType(
+                id=img.id,
+                image_type=img.image_type,
+                image_path=img.image_path,
+            )
+            for img in images
+        ],
+        **values,
+    )
+
+
+def _selected_columns(selections) -> set[str]:
+    """Requested product columns, snake_cased; id is always kept."""
+    cols = {"id"}
+    _collect_columns(selections, cols)
+    return cols
+
+
+def _collect_columns(selections, cols: set[str]) -> None:
+    """Collect named product fields, descending into fragments."""
+    for sel in selections:
+        name = to_snake_case(getattr(sel, "name", "") or "")
+        if name in _PRODUCT_FIELD_SET:
+            cols.add(name)
+        # Inline fragments and fragment spreads carry their fields one
+        # level down; recurse like _selects_images does
+        if getattr(sel, "selections", None):
+            _collect_columns(sel.selections, cols)
+
+
+def _selects_images(selections) -> bool:
+    """True if the operation selects the `images` sub-field anywhere."""
+    for sel in selections:
+        if getattr(sel, "name", None) == "images":
+            return True
+        if getattr(sel, "selections", None) and _selects_images(sel.selections):
+            return True
+    return False
+
+
+def _encode_cursor(p) -> str:
+    """Encode a keyset cursor from the (product_name, id) sort key."""
+    return base64.b64encode(f"{p.product_name}|{p.id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, UUID]:
+    """Decode a keyset cursor back into (product_name, id)."""
+    name, _, raw_id = base64.b64decode(cursor.encode()).decode().rpartition("|")
+    return name, UUID(raw_id)
+
+
 @strawberry.type
 class BusinessQuery:
     """Business backend queries (FAQs, Documents, Products)."""
@@ -41,7 +119,7 @@ class BusinessQuery:
     async def get_faqs(
         self, tenant: str, data_service: Annotated[TenantDataService, Inject]
     ) -> list[FAQ]:
-        logger.info(f"📋 GraphQL: getFaqs(tenant={tenant})")
+        logger.debug("📋 GraphQL: getFaqs(tenant={})", tenant)
 
         try:
             faq_data = await data_service.read_faqs_csv(tenant)
@@ -62,6 +140,36 @@ class BusinessQuery:
 
         return faqs
 
+    @strawberry.field
+    @inject
+    async def match_faq(
+        self,
+        tenant: str,
+        message: str,
+        data_service: Annotated[TenantDataService, Inject],
+    ) -> FAQ | None:
+        """
+        Fast-path FAQ lookup: classify a message against all tenant FAQ
+        patterns in one scan of a precompiled alternation, instead of a
+        per-request loop over every pattern list.
+        """
+        logger.debug("📋 GraphQL: matchFaq(tenant={})", tenant)
+
+        matcher = faq_matcher.get_cached_matcher(tenant)
+        if matcher is None:
+            try:
+                faq_data = await data_service.read_faqs_csv(tenant)
+            except FileNotFoundError:
+                return None
+            matcher = faq_matcher.build_matcher(tenant, faq_data)
+
+        hit = matcher.match(message)
+        if hit is None:
+            return None
+
+        category, response = hit
+        return FAQ(type="faq", patterns=[], response=response, category=category)
+
     # =====================
     # Documents
     # =====================
@@ -71,7 +179,7 @@ class BusinessQuery:
     async def get_documents(
         self, tenant: str, data_service: Annotated[TenantDataService, Inject]
     ) -> list[Document]:
-        logger.info(f"📚 GraphQL: getDocuments(tenant={tenant})")
+        logger.debug("📚 GraphQL: getDocuments(tenant={})", tenant)
 
         try:
             chunks = await data_service.read_chunks_csv(tenant)
@@ -96,115 +204,109 @@ class BusinessQuery:
     @inject
     async def products(
         self,
+        info: strawberry.Info,
         product_service: Annotated[ProductService, Inject],
         limit: int = 50,
         offset: int = 0,
     ) -> list[ProductStockType]:
-        logger.info(f"📦 GraphQL: products(limit={limit}, offset={offset})")
+        logger.debug("📦 GraphQL: products(limit={}, offset={})", limit, offset)
 
-        products = await product_service.list_products(limit=limit, offset=offset)
+        # SELECT only the columns the client actually asked for
+        columns = _selected_columns(info.selected_fields[0].selections)
+        products = await product_service.list_products(
+            limit=limit, offset=offset, columns=columns
+        )
 
-        result: list[ProductStockType] = []
+        # One batched query for all images instead of one query per product,
+        # skipped entirely when the client didn't select `images`
+        images_map: dict = {}
+        if _selects_images(info.selected_fields[0].selections):
+            images_map = await product_service.get_images_by_product_ids(
+                [p.id for p in products]
+            )
 
-        for p in products:
-            images = await product_service.get_images_by_product_id(p.id)
+        result: list[ProductStockType] = [
+            _to_product_type(p, images_map.get(p.id, []), columns) for p in products
+        ]
 
-            result.append(
-                ProductStockType(
-                    id=p.id,
-                    created_at=p.created_at,
-                    last_updated_at=p.last_updated_at,
-                    product_id=p.product_id,
-                    product_name=p.product_name,
-                    product_sku=p.product_sku,
-                    supplier_id=p.supplier_id,
-                    supplier_name=p.supplier_name,
-                    quantity_on_hand=p.quantity_on_hand,
-                    quantity_reserved=p.quantity_reserved,
-                    quantity_available=p.quantity_available,
-                    minimum_stock_level=p.minimum_stock_level,
-                    reorder_point=p.reorder_point,
-                    optimal_stock_level=p.optimal_stock_level,
-                    reorder_quantity=p.reorder_quantity,
-                    average_daily_usage=p.average_daily_usage,
-                    last_order_date=p.last_order_date,
-                    last_stock_count_date=p.last_stock_count_date,
-                    expiration_date=p.expiration_date,
-                    unit_cost=p.unit_cost,
-                    total_value=p.total_value,
-                    batch_number=p.batch_number,
-                    warehouse_location=p.warehouse_location,
-                    shelf_location=p.shelf_location,
-                    stock_status=p.stock_status,
-                    is_active=p.is_active,
-                    notes=p.notes,
-                    images=[
-                        ProductImageType(
-                            id=img.id,
-                            image_type=img.image_type,
-                            image_path=img.image_path,
-                        )
-                        for img in images
-                    ],
-                )
+        logger.debug("✅ GraphQL: Returned {} products", len(result))
+        return result
+
+    @strawberry.field
+    @inject
+    async def products_connection(
+        self,
+        info: strawberry.Info,
+        product_service: Annotated[ProductService, Inject],
+        first: int = 50,
+        after: str | None = None,
+    ) -> ProductStockConnection:
+        """
+        Cursor-paginated products query (keyset pagination).
+
+        Deep pages stay O(page size) instead of O(offset): the cursor
+        encodes the last row's (product_name, id) sort key and the next
+        page seeks directly to it. Prefer this over products(offset=...)
+        for large catalogs.
+        """
+        logger.debug("📦 GraphQL: productsConnection(first={}, after={})", first, after)
+
+        cursor_name: str | None = None
+        cursor_id: UUID | None = None
+        if after is not None:
+            cursor_name, cursor_id = _decode_cursor(after)
+
+        # Fetch one extra row to know whether a next page exists
+        products = await product_service.list_products_after(
+            cursor_product_name=cursor_name,
+            cursor_id=cursor_id,
+            limit=first + 1,
+        )
+
+        has_next_page = len(products) > first
+        products = products[:first]
+
+        images_map: dict = {}
+        if _selects_images(info.selected_fields[0].selections):
+            images_map = await product_service.get_images_by_product_ids(
+                [p.id for p in products]
             )
 
-        logger.info(f"✅ GraphQL: Returned {len(result)} products")
-        return result
+        edges: list[ProductStockEdge] = [
+            ProductStockEdge(
+                node=_to_product_type(p, images_map.get(p.id, [])),
+                cursor=_encode_cursor(p),
+            )
+            for p in products
+        ]
+
+        return ProductStockConnection(
+            edges=edges,
+            end_cursor=edges[-1].cursor if edges else None,
+            has_next_page=has_next_page,
+        )
 
     @strawberry.field
     @inject
     async def product(
         self,
+        info: strawberry.Info,
         product_service: Annotated[ProductService, Inject],
         id: UUID,
     ) -> ProductStockType | None:
-        logger.info(f"📦 GraphQL: product(id={id})")
+        logger.debug("📦 GraphQL: product(id={})", id)
 
-        p = await product_service.get_product(id)
+        columns = _selected_columns(info.selected_fields[0].selections)
+        p = await product_service.get_product(id, columns=columns)
 
         if p is None:
             return None
 
-        images = await product_service.get_images_by_product_id(p.id)
-
-        return ProductStockType(
-            id=p.id,
-            created_at=p.created_at,
-            last_updated_at=p.last_updated_at,
-            product_id=p.product_id,
-            product_name=p.product_name,
-            product_sku=p.product_sku,
-            supplier_id=p.supplier_id,
-            supplier_name=p.supplier_name,
-            quantity_on_hand=p.quantity_on_hand,
-            quantity_reserved=p.quantity_reserved,
-            quantity_available=p.quantity_available,
-            minimum_stock_level=p.minimum_stock_level,
-            reorder_point=p.reorder_point,
-            optimal_stock_level=p.optimal_stock_level,
-            reorder_quantity=p.reorder_quantity,
-            average_daily_usage=p.average_daily_usage,
-            last_order_date=p.last_order_date,
-            last_stock_count_date=p.last_stock_count_date,
-            expiration_date=p.expiration_date,
-            unit_cost=p.unit_cost,
-            total_value=p.total_value,
-            batch_number=p.batch_number,
-            warehouse_location=p.warehouse_location,
-            shelf_location=p.shelf_location,
-            stock_status=p.stock_status,
-            is_active=p.is_active,
-            notes=p.notes,
-            images=[
-                ProductImageType(
-                    id=img.id,
-                    image_type=img.image_type,
-                    image_path=img.image_path,
-                )
-                for img in images
-            ],
-        )
+        images: list = []
+        if _selects_images(info.selected_fields[0].selections):
+            images = await product_service.get_images_by_product_id(p.id)
+
+        return _to_product_type(p, images, columns)
 
     # =====================
     # Search (simple, NO IA)
@@ -218,7 +320,7 @@ class BusinessQuery:
         name: str,
         limit: int = 20,
     ) -> list[ProductSummaryType]:
-        logger.info(f"🔍 GraphQL: searchProducts(name={name})")
+        logger.debug("🔍 GraphQL: searchProducts(name={})", name)
 
         products = await product_service.search_by_name(name=name, limit=limit)
 
@@ -79,6 +79,23 @@ class ProductStockType:
     # 🔑 RELACIÓN
     images: list["ProductImageType"]
 
+@strawberry.type
+class ProductStockEdge:
+    """Single product plus its pagination cursor."""
+
+    node: "ProductStockType"
+    cursor: str
+
+
+@strawberry.type
+class ProductStockConnection:
+    """Cursor-paginated page of products (keyset pagination)."""
+
+    edges: list[ProductStockEdge]
+    end_cursor: str | None
+    has_next_page: bool
+
+
 @strawberry.type
 class ProductSummaryType:
     """Simplified product summary for search results."""
@@ -1,23 +1,114 @@
+import asyncio
 import base64
+import hashlib
+import json
 import os
 import shutil
+import tempfile
+import time
 from typing import List, Optional
 
 import cv2
 import mlflow
 import numpy as np
-from fastapi import APIRouter, File, Form, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, File, Form, Request, UploadFile, HTTPException
+from fastapi.responses import JSONResponse, Response
+from datetime import datetime
+
 from mlflow.entities import ViewType
+from mlflow.tracking import MlflowClient
 
 # este es el motor de reconocimiento de productos
 from ml.models.sift_engine import get_sift_engine
+from services.video_service import VideoService
 
 router = APIRouter()
 
 SIFT_STORAGE = "sift_data.pkl"
 
 sift_engine = get_sift_engine(str(SIFT_STORAGE))
+video_service = VideoService(sift_engine)
+
+# 1 MiB chunks: large enough to keep syscall count low, small enough to
+# keep the event loop responsive while a big upload streams in.
+_UPLOAD_CHUNK = 1 << 20
+
+
+async def _read_upload(upload: UploadFile) -> bytearray:
+    """
+    Read an UploadFile in chunks instead of one whole-file read().
+
+    Keeps the event loop yielding between chunks for large uploads; the
+    returned bytearray feeds np.frombuffer without another copy. When the
+    multipart headers declare the size, the buffer is preallocated once,
+    so filling it is a memcpy per chunk with no growth reallocations.
+    """
+    buf = bytearray(getattr(upload, "size", None) or 0)
+    pos = 0
+    while chunk := await upload.read(_UPLOAD_CHUNK):
+        end = pos + len(chunk)
+        if end <= len(buf):
+            buf[pos:end] = chunk
+        else:
+            # Declared size missing or wrong: trim and fall back to growing
+            del buf[pos:]
+            buf.extend(chunk)
+        pos = end
+    del buf[pos:]
+    return buf
+
+
+def _normalize_decoded(cv_image):
+    """
+    Coerce an IMREAD_UNCHANGED decode to 8-bit with 1/3/4 channels.
+
+    UNCHANGED keeps whatever the file stores: 16-bit PNGs come back as
+    uint16 (SIFT only accepts 8-bit input) and gray+alpha as 2 channels,
+    which neither the grayscale nor the BGRA branch downstream handles.
+    """
+    if cv_image.dtype != np.uint8:
+        if cv_image.dtype == np.uint16:
+            # Drop the low byte: exact 65535 -> 255 scaling
+            cv_image = (cv_image >> 8).astype(np.uint8)
+        else:
+            cv_image = cv2.normalize(
+                cv_image.astype(np.float32), None, 0, 255, cv2.NORM_MINMAX
+            ).astype(np.uint8)
+    if cv_image.ndim == 3 and cv_image.shape[2] == 2:
+        # Gray + alpha: expand to BGRA so the alpha-mask branch applies
+        gray = cv_image[:, :, 0]
+        cv_image = cv2.merge((gray, gray, gray, cv_image[:, :, 1]))
+    return cv_image
+
+
+def _binarize_mask(cv_mask):
+    """
+    Binarize a grayscale mask in place: >=128 -> 255, else 0.
+
+    Both ufuncs write into the existing buffer (the bool view shares the
+    uint8 storage), so no temporary arrays are allocated.
+    """
+    np.greater_equal(cv_mask, 128, out=cv_mask.view(bool))
+    np.multiply(cv_mask, 255, out=cv_mask)
+    return cv_mask
+
+
+def find_optimal_threshold(cv_image, cv_mask=None, target=1500):
+    """
+    Single-pass alternative to bisecting contrast_threshold: detect once
+    at a very low threshold and keep the ~target strongest keypoints by
+    response. Keypoint count is monotonic in the contrast threshold, so
+    this replaces up to 8 full SIFT pyramid runs with one.
+
+    Returns (keypoints, descriptors) for the kept subset.
+    """
+    # Large frames amortize the tiling overhead: detect per tile in
+    # parallel (SIFT releases the GIL) and merge before filtering
+    if cv_image.shape[0] * cv_image.shape[1] >= 2_000_000:
+        kps, desc, responses = sift_engine.detect_keypoints_tiled(cv_image, cv_mask)
+    else:
+        kps, desc, responses = sift_engine.detect_keypoints_raw(cv_image, cv_mask)
+    return sift_engine.filter_keypoints_by_response(kps, desc, responses, target)
 
 
 @router.post('/register')
@@ -35,30 +126,58 @@ async def register(
     Opcional: 'mask' file (binary image), 'threshold' float.
     """
     try:
-        img_bytes = await image.read()
+        img_bytes = await _read_upload(image)
         nparr = np.frombuffer(img_bytes, np.uint8)
-        cv_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
+        # IMREAD_UNCHANGED keeps an alpha channel when the upload has one
+        # (e.g. background-removed PNGs), which doubles as a free mask;
+        # decode off the event loop like the rest of the pipeline
+        cv_image = await asyncio.to_thread(cv2.imdecode, nparr, cv2.IMREAD_UNCHANGED)
+
         if cv_image is None:
             return JSONResponse(status_code=400, content={'error': 'Invalid image'})
+        cv_image = _normalize_decoded(cv_image)
 
         # Mask handling
         cv_mask = None
+        if cv_image.ndim == 2:
+            cv_image = cv2.cvtColor(cv_image, cv2.COLOR_GRAY2BGR)
+        elif cv_image.shape[2] == 4:
+            # Alpha -> binary mask without a separate decode; the BGR view
+            # is a zero-copy slice made contiguous once for SIFT
+            cv_mask = (cv_image[:, :, 3] >= 128).astype(np.uint8) * 255
+            cv_image = np.ascontiguousarray(cv_image[:, :, :3])
         if mask:
-            mask_bytes = await mask.read()
+            mask_bytes = await _read_upload(mask)
             mask_nparr = np.frombuffer(mask_bytes, np.uint8)
             cv_mask = cv2.imdecode(mask_nparr, cv2.IMREAD_GRAYSCALE)
             
             # Ensure mask is same size as image
             if cv_mask is not None:
                  cv_mask = cv2.resize(cv_mask, (cv_image.shape[1], cv_image.shape[0]))
-                 # Threshold just to be safe it's binary
-                 _, cv_mask = cv2.threshold(cv_mask, 127, 255, cv2.THRESH_BINARY)
+                 # Binarize just to be safe (in-place NumPy pass, no OpenCV dispatch)
+                 cv_mask = _binarize_mask(cv_mask)
         
         # Registrar con los parámetros
-        success, msg = sift_engine.register_product(name, cv_image, mask=cv_mask, contrast_threshold=threshold)
+        if threshold <= 0:
+            # Auto mode: one low-threshold detect + response filter, then
+            # reuse those exact features — no second SIFT pass at register
+            kps, desc = await asyncio.to_thread(find_optimal_threshold, cv_image, cv_mask)
+            success, msg = await asyncio.to_thread(
+                sift_engine.register_product_precomputed, name, kps, desc
+            )
+        else:
+            # SIFT + pickle/npz write are CPU- and disk-bound: keep them
+            # off the event loop
+            success, msg = await asyncio.to_thread(
+                sift_engine.register_product,
+                name,
+                cv_image,
+                mask=cv_mask,
+                contrast_threshold=threshold,
+            )
         
         if success:
+            _invalidate_versions_cache()  # a new MLflow run now exists
             return JSONResponse(status_code=200, content={'message': msg})
         else:
             return JSONResponse(status_code=500, content={'error': msg})
@@ -71,39 +190,58 @@ async def register(
 async def preview_keypoints(
     image: UploadFile = File(...),
     threshold: float = Form(0.04),
+    target_points: int = Form(0),
     mask: Optional[UploadFile] = File(None)
 ):
     """
     Previsualización de puntos clave, previo a guardar el producto.
     Expects: 'image', 'mask' (opt), 'threshold' (opt).
+    Opcional: 'target_points' > 0 detecta una sola vez con umbral bajo y
+    filtra por respuesta hasta ~target_points (evita re-detectar SIFT).
     """
     try:
-        img_bytes = await image.read()
+        img_bytes = await _read_upload(image)
         nparr = np.frombuffer(img_bytes, np.uint8)
-        cv_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
+        cv_image = await asyncio.to_thread(cv2.imdecode, nparr, cv2.IMREAD_COLOR)
+
         if cv_image is None:
             return JSONResponse(status_code=400, content={'error': 'Invalid image'})
 
         cv_mask = None
         if mask:
-            mask_bytes = await mask.read()
+            mask_bytes = await _read_upload(mask)
             mask_nparr = np.frombuffer(mask_bytes, np.uint8)
             cv_mask = cv2.imdecode(mask_nparr, cv2.IMREAD_GRAYSCALE)
             if cv_mask is not None:
                  cv_mask = cv2.resize(cv_mask, (cv_image.shape[1], cv_image.shape[0]))
-                 _, cv_mask = cv2.threshold(cv_mask, 127, 255, cv2.THRESH_BINARY)
+                 cv_mask = _binarize_mask(cv_mask)
 
-        # Detect & Draw
-        vis_img, count = sift_engine.detect_keypoints_vis(cv_image, mask=cv_mask, contrast_threshold=threshold)
-        
-        # Encode return
-        _, buffer = cv2.imencode('.jpg', vis_img)
+        # Detect & Draw (SIFT is CPU-bound, keep it off the event loop)
+        if target_points > 0:
+            # Single low-threshold pass + response filter instead of
+            # re-running SIFT per candidate threshold
+            kps, desc, responses = await asyncio.to_thread(
+                sift_engine.detect_keypoints_raw, cv_image, cv_mask
+            )
+            kps, _ = sift_engine.filter_keypoints_by_response(kps, desc, responses, target_points)
+            vis_img = cv2.drawKeypoints(cv_image, kps, None, flags=cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
+            count = len(kps)
+        else:
+            vis_img, count = await asyncio.to_thread(
+                sift_engine.detect_keypoints_vis, cv_image, cv_mask, threshold
+            )
+
+        # Encode return — WebP is both faster to encode and ~30-50%
+        # smaller than JPEG for these synthetic keypoint overlays
+        ok, buffer = cv2.imencode('.webp', vis_img, [cv2.IMWRITE_WEBP_QUALITY, 80])
+        if not ok:
+            _, buffer = cv2.imencode('.jpg', vis_img)
         vis_base64 = base64.b64encode(buffer).decode('utf-8')
-        
+
         #retorna la imagen con los puntos dibujados
         return {
             'keypoint_image': vis_base64,
+            'format': 'webp' if ok else 'jpeg',
             'count': count
         }
     except Exception as e:
@@ -116,14 +254,21 @@ async def predict(image: UploadFile = File(...)):
     Identificación de producto en la imagen subida.
     """
     try:
-        img_bytes = await image.read()
+        img_bytes = await _read_upload(image)
         nparr = np.frombuffer(img_bytes, np.uint8)
-        cv_image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
+        # Decode + SIFT matching are CPU-bound: run them in the default
+        # thread pool so concurrent requests don't block the event loop.
+        # Half-resolution grayscale decode: SIFT is scale-invariant, only
+        # ever sees luma, and high-res phone photos dominate predict
+        # latency through the pyramid cost — so skip the color planes too.
+        cv_image = await asyncio.to_thread(
+            cv2.imdecode, nparr, cv2.IMREAD_REDUCED_GRAYSCALE_2
+        )
+
         if cv_image is None:
              return JSONResponse(status_code=400, content={'error': 'Invalid image'})
 
-        label, matches = sift_engine.identify_product(cv_image)  # identifica el producto
+        label, matches = await sift_engine.identify_product_async(cv_image)  # identifica el producto
         
         if label:
             return {
@@ -141,31 +286,113 @@ async def predict(image: UploadFile = File(...)):
         return JSONResponse(status_code=500, content={'error': str(e)})
 
 
+@router.post('/analyze_video')
+async def analyze_video(
+    video: UploadFile = File(...),
+    frame_every_seconds: float = Form(1.0),
+):
+    """
+    Detecta productos registrados en un video subido.
+
+    Expects: 'video' file. Opcional: 'frame_every_seconds' (intervalo de
+    muestreo). Devuelve detecciones por frame y un resumen por producto.
+    """
+    tmp_path = None
+    try:
+        # cv2.VideoCapture needs a real path: stream the upload to a temp
+        # file in 1 MiB chunks instead of buffering it all in memory. The
+        # matching write buffer keeps syscall count at one per chunk for
+        # hundred-MB uploads.
+        suffix = os.path.splitext(video.filename or "")[1] or ".mp4"
+        with tempfile.NamedTemporaryFile(
+            delete=False, suffix=suffix, buffering=_UPLOAD_CHUNK
+        ) as tmp:
+            while chunk := await video.read(_UPLOAD_CHUNK):
+                tmp.write(chunk)
+            tmp_path = tmp.name
+
+        # Decoding + batched SIFT matching are CPU-bound
+        result = await asyncio.to_thread(
+            video_service.process_video, tmp_path, frame_every_seconds
+        )
+        return result
+    except Exception as e:
+        return JSONResponse(status_code=500, content={'error': str(e)})
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# Cache for /mlflow/versions: (timestamp, payload). The tracking store
+# changes only on register/restore, so dashboard polls can be served
+# from memory for a short window.
+_VERSIONS_TTL = 30.0
+_versions_cache: Optional[tuple] = None
+
+
+def _invalidate_versions_cache():
+    global _versions_cache
+    _versions_cache = None
+
+
+# Experiment ids are immutable once created, so one lookup per process
+# is enough; None just means the experiment doesn't exist yet.
+_experiment_id: Optional[str] = None
+
+
+def _get_experiment_id() -> Optional[str]:
+    global _experiment_id
+    if _experiment_id is None:
+        experiment = mlflow.get_experiment_by_name("SIFT_Product_Registry")
+        if experiment is not None:
+            _experiment_id = experiment.experiment_id
+    return _experiment_id
+
+
+def _versions_response(request: Request, versions: list, etag: str):
+    """304 when the client already holds this version list, 200 otherwise."""
+    headers = {'ETag': etag, 'Cache-Control': 'public, max-age=30'}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=versions, headers=headers)
+
+
 @router.get('/mlflow/versions')
-def list_versions():
+def list_versions(request: Request):
     """
     Lista de versiones del modelo entrenado de predicciones.
     """
+    global _versions_cache
+    if _versions_cache is not None:
+        ts, versions, etag = _versions_cache
+        if time.monotonic() - ts < _VERSIONS_TTL:
+            return _versions_response(request, versions, etag)
+
     try:
-        experiment = mlflow.get_experiment_by_name("SIFT_Product_Registry")
-        if not experiment:
+        experiment_id = _get_experiment_id()
+        if experiment_id is None:
             return []
-        
-        # ordenados desde el mas reciente
-        runs = mlflow.search_runs(
-            experiment_ids=[experiment.experiment_id],
+
+        # ordenados desde el mas reciente; MlflowClient returns plain Run
+        # objects, skipping the pandas DataFrame mlflow.search_runs builds
+        runs = MlflowClient().search_runs(
+            [experiment_id],
             run_view_type=ViewType.ACTIVE_ONLY,
-            order_by=["attribute.start_time DESC"]
+            order_by=["attribute.start_time DESC"],
+            max_results=100,
         )
-        
+
         versions = []
-        for _, run in runs.iterrows():
+        for run in runs:
+            started = datetime.fromtimestamp(run.info.start_time / 1000)
             versions.append({
-                'run_id': run['run_id'],
-                'date': run['start_time'].strftime('%Y-%m-%d %H:%M:%S') if hasattr(run['start_time'], 'strftime') else str(run['start_time']),
-                'product_count': int(run['metrics.product_count']) if 'metrics.product_count' in run and not np.isnan(run['metrics.product_count']) else 0
+                'run_id': run.info.run_id,
+                'date': started.strftime('%Y-%m-%d %H:%M:%S'),
+                'product_count': int(run.data.metrics.get('product_count', 0))
             })
-        return versions
+        etag = hashlib.blake2s(json.dumps(versions).encode()).hexdigest()
+        _versions_cache = (time.monotonic(), versions, etag)
+        return _versions_response(request, versions, etag)
     except Exception as e:
         return JSONResponse(status_code=500, content={'error': str(e)})
 
@@ -194,7 +421,8 @@ def restore_version(request: RestoreRequest):
         
         # Reload memory
         sift_engine.load_database()
-        
+
+        _invalidate_versions_cache()
         return {'message': f'Restored version {run_id}', 'count': len(sift_engine.database)}
     except Exception as e:
         return JSONResponse(status_code=500, content={'error': str(e)})
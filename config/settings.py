@@ -29,6 +29,15 @@ class BusinessSettings(BaseSettings):
     openai_model: str = "gpt-4.1-mini"
     openai_max_tokens: int = 1024
 
+    # Connection pool tuning (AsyncAdaptedQueuePool)
+    pg_pool_size: int = 10
+    pg_max_overflow: int = 5
+    pg_pool_recycle: int = 60
+    pg_pool_timeout: int = 30
+    # True when connecting through PgBouncer in transaction mode, where
+    # server-side prepared statements must be disabled.
+    pg_use_pgbouncer: bool = False
+
     # Feature flags for modularity
     llm_enabled: bool = True
 
@@ -100,30 +100,30 @@ async def create_search_service(
     return SearchService(llm_provider, product_service)
 
 
-def providers() -> Iterable[aioinject.Provider[Any]]:
-    """
-    Create and return all dependency injection providers for 
-
-    Includes:
-    - TenantDataService: Reads tenant data from CSV files
-    - ProductService: CRUD operations for product_stocks
-    - LLMProvider: OpenAI via LangChain (optional)
-    - SearchService: Semantic search with LLM
-    """
-    providers_list: list[aioinject.Provider[Any]] = []
-
+# All dependency injection providers, built once at import time.
+#
+# Includes:
+# - TenantDataService: Reads tenant data from CSV files
+# - ProductService: CRUD operations for product_stocks
+# - LLMProvider: OpenAI via LangChain (optional)
+# - SearchService: Semantic search with LLM
+# - OCRService: OCR + Vision processing
+_PROVIDERS: tuple[aioinject.Provider[Any], ...] = (
     # Core services (always available)
-    providers_list.append(aioinject.Singleton(create_tenant_data_service))
-
+    aioinject.Singleton(create_tenant_data_service),
     # Database
-    providers_list.append(aioinject.Singleton(create_session_factory))
-    providers_list.append(aioinject.Singleton(create_product_service))
-
+    aioinject.Singleton(create_session_factory),
+    aioinject.Singleton(create_product_service),
     # LLM (optional - can return None)
-    providers_list.append(aioinject.Singleton(create_llm_provider_instance))
-    providers_list.append(aioinject.Singleton(create_search_service))
+    aioinject.Singleton(create_llm_provider_instance),
+    aioinject.Singleton(create_search_service),
+    aioinject.Singleton(create_ocr_service),
+)
 
-    return providers_list
+
+def providers() -> Iterable[aioinject.Provider[Any]]:
+    """Return all dependency injection providers for business_backend."""
+    return _PROVIDERS
 
 
 @functools.cache
@@ -139,9 +139,5 @@ def create_business_container() -> aioinject.Container:
     container = aioinject.Container()
     for provider in providers():
         container.register(provider)
-        
-    container.register(
-        aioinject.Singleton(create_ocr_service)
-    )
-    
+
     return container
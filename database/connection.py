@@ -6,8 +6,9 @@ Single-tenant async engine using SQLAlchemy 2.0.
 
 import functools
 
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine as sa_create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from config import get_business_settings
 
@@ -16,15 +17,45 @@ def create_async_engine(database_url: str) -> AsyncEngine:
     """
     Create async SQLAlchemy engine.
 
+    Connections are reused via AsyncAdaptedQueuePool (the asyncio-safe
+    queue pool) instead of NullPool, which opened and tore down a TCP
+    connection + auth handshake for every session. Pool numbers come
+    from settings so deployments can tune them.
+
     Args:
         database_url: PostgreSQL connection URL
 
     Returns:
         AsyncEngine instance
     """
-    return sa_create_async_engine(  
+    settings = get_business_settings()
+    if settings.pg_use_pgbouncer:
+        # PgBouncer in transaction mode breaks server-side prepared
+        # statements; disable both caches. jit=off skips PG's query JIT
+        # warm-up, which costs more than it saves on small OLTP queries.
+        connect_args = {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "server_settings": {
+                "jit": "off",
+                "application_name": "business_backend",
+            },
+        }
+    else:
+        # Direct connection: a larger cache keeps plans warm for this
+        # app's small, repetitive set of product queries.
+        connect_args = {
+            "prepared_statement_cache_size": 500,
+            "statement_cache_size": 500,
+        }
+    return sa_create_async_engine(
         database_url,
-        poolclass=NullPool,  # Recommended for async
+        connect_args=connect_args,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.pg_pool_size,
+        max_overflow=settings.pg_max_overflow,
+        pool_recycle=settings.pg_pool_recycle,
+        pool_timeout=settings.pg_pool_timeout,
         echo=False,
     )
 
@@ -38,4 +69,8 @@ def get_engine() -> AsyncEngine:
         Cached AsyncEngine instance
     """
     settings = get_business_settings()
+    # Redact once here (everything before '@' is credentials); get_engine
+    # is cached, so this never runs on the request path.
+    redacted_url = str(settings.pg_url).split("@", 1)[-1][:50]
+    logger.debug("Creating database engine for {}", redacted_url)
     return create_async_engine(str(settings.pg_url))
@@ -4,28 +4,49 @@ Session Factory for Business Backend.
 Provides async session management using SQLAlchemy 2.0.
 """
 
+import functools
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState
 
 from database.connection import get_engine
 
 
+def _mark_dml(orm_execute_state: ORMExecuteState) -> None:
+    """
+    Flag sessions that executed non-SELECT statements.
+
+    Core DML issued through session.execute() never shows up in the
+    unit-of-work state (new/dirty/deleted), so get_session tracks it
+    here to know a COMMIT is still required.
+    """
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["pending_dml"] = True
+
+
+@functools.cache
 def get_session_factory() -> async_sessionmaker[AsyncSession]:
     """
-    Get async session factory.
+    Get cached async session factory.
+
+    The factory is stateless configuration, so one instance is shared
+    instead of rebuilding it for every session.
 
     Returns:
         async_sessionmaker configured for the engine
     """
     engine = get_engine()
-    return async_sessionmaker(
+    factory = async_sessionmaker(
         bind=engine,
         class_=AsyncSession,
         expire_on_commit=False,
         autoflush=False,
     )
+    event.listen(factory.class_.sync_session_class, "do_orm_execute", _mark_dml)
+    return factory
 
 
 @asynccontextmanager
@@ -44,7 +65,37 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with factory() as session:
         try:
             yield session
-            await session.commit()
+            # Read-only sessions have nothing to flush; skip the COMMIT
+            # round-trip to the server in that case. Core DML through
+            # session.execute() bypasses the unit of work, so it is
+            # tracked separately via the do_orm_execute hook above.
+            if (
+                session.new
+                or session.dirty
+                or session.deleted
+                or session.sync_session.info.get("pending_dml")
+            ):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
+
+
+@asynccontextmanager
+async def get_connection() -> AsyncGenerator[AsyncConnection, None]:
+    """
+    Async context manager for Core-level connections.
+
+    Cheaper than get_session for raw SQL: no ORM identity map,
+    autoflush or unit-of-work bookkeeping.
+
+    Usage:
+        async with get_connection() as conn:
+            result = await conn.execute(query)
+
+    Yields:
+        AsyncConnection instance
+    """
+    engine = get_engine()
+    async with engine.connect() as connection:
+        yield connection
@@ -4,8 +4,9 @@ LLM Provider for Business Backend.
 Simple OpenAI provider using LangChain for tool calling.
 """
 
+import functools
+
 from langchain_core.language_models import BaseChatModel
-from langchain_openai import ChatOpenAI
 
 from config import get_business_settings
 
@@ -21,6 +22,7 @@ class LLMProvider:
             model: LangChain chat model instance
         """
         self.model = model
+        self._bound_models: dict[tuple[str, ...], BaseChatModel] = {}
 
     def get_model(self) -> BaseChatModel:
         """Get the underlying LangChain model."""
@@ -30,35 +32,58 @@ class LLMProvider:
         """
         Bind tools to the model for function calling.
 
+        bind_tools() serializes every tool's pydantic schema to an OpenAI
+        function spec, so the bound model is cached per tool-name set and
+        reused across requests.
+
         Args:
             tools: List of LangChain tools
 
         Returns:
             Model with tools bound
         """
-        return self.model.bind_tools(tools)
+        key = tuple(tool.name for tool in tools)
+        bound = self._bound_models.get(key)
+        if bound is None:
+            bound = self._bound_models[key] = self.model.bind_tools(tools)
+        return bound
 
 
+@functools.cache
 def create_llm_provider() -> LLMProvider | None:
     """
     Create LLM provider from settings.
 
+    Cached so the ChatOpenAI client (and its HTTP connection pool) is
+    built once per process rather than per caller.
+
     Returns:
         LLMProvider instance or None if disabled/not configured
     """
     settings = get_business_settings()
 
-    if not settings.llm_enabled:
+    enabled, api_key = settings.llm_enabled, settings.openai_api_key
+    if not enabled or not api_key:
         return None
 
-    if not settings.openai_api_key:
-        return None
+    # Imported lazily: langchain_openai pulls in the openai SDK and is
+    # only needed when the LLM feature is actually enabled/configured.
+    import httpx
+    from langchain_openai import ChatOpenAI
+
+    # One shared async client with keep-alive: reusing warm TLS
+    # connections to the OpenAI API saves a handshake per request.
+    http_async_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        timeout=httpx.Timeout(60.0, connect=10.0),
+    )
 
     model = ChatOpenAI(
-        api_key=settings.openai_api_key,
+        api_key=api_key,
         model=settings.openai_model,
         max_tokens=settings.openai_max_tokens,
         temperature=0,  # Deterministic for tool calling
+        http_async_client=http_async_client,
     )
 
     return LLMProvider(model)
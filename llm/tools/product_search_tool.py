@@ -72,20 +72,28 @@ class ProductSearchTool(BaseTool):
         if not products:
             return f"No products found matching '{search_term}'"
 
-        # Format results for LLM
-        results = []
+        # Compact TSV: the payload is re-read by the second LLM call, so
+        # fewer tokens means lower latency and cost. The system prompt
+        # documents the format for the model.
+        rows = [
+            "name\tsku\tqty\tstatus\tprice\tsupplier\tlocation"
+        ]
         for p in products:
-            status_text = self._get_stock_status_text(p.stock_status)
-            results.append(
-                f"- {p.product_name} (SKU: {p.product_sku or 'N/A'}): "
-                f"{p.quantity_available} units available, "
-                f"Status: {status_text}, "
-                f"Price: ${p.unit_cost:.2f}, "
-                f"Supplier: {p.supplier_name}, "
-                f"Location: {p.warehouse_location}"
+            rows.append(
+                "\t".join(
+                    (
+                        p.product_name,
+                        p.product_sku or "N/A",
+                        str(p.quantity_available),
+                        self._get_stock_status_text(p.stock_status),
+                        f"{p.unit_cost:.2f}",
+                        p.supplier_name,
+                        p.warehouse_location,
+                    )
+                )
             )
 
-        return f"Found {len(products)} products:\n" + "\n".join(results)
+        return f"Found {len(products)} products:\n" + "\n".join(rows)
 
     def _get_stock_status_text(self, status: int) -> str:
         """Convert stock status code to text."""
@@ -15,19 +15,116 @@ Usage:
 """
 
 import argparse
+import functools
+import json
+import sys
 
 import strawberry
 import uvicorn
+from sqlalchemy import text
 from aioinject.ext.strawberry import AioInjectExtension
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, Response
 from loguru import logger
+from strawberry.extensions import ParserCache, ValidationCache
 from strawberry.fastapi import GraphQLRouter
 from fastapi.staticfiles import StaticFiles
 
+from api.graphql.extensions import ResponseCache
 from api.graphql.queries import BusinessQuery
 from api.rest.routes2 import router as product_router
+from config import get_business_settings
 from container import create_business_container
+from database.connection import get_engine
+
+# CORS headers precomputed once: this service allows every origin, so the
+# response is a constant and none of it needs rebuilding per request.
+_CORS_HEADERS: list[tuple[bytes, bytes]] = [
+    (b"access-control-allow-origin", b"*"),
+]
+_CORS_PREFLIGHT_HEADERS: list[tuple[bytes, bytes]] = [
+    *_CORS_HEADERS,
+    (b"access-control-allow-methods", b"*"),
+    (b"access-control-allow-headers", b"*"),
+    (b"access-control-max-age", b"600"),
+]
+
+# /health and / never change, so their JSON is encoded once at import
+# time and served as raw bytes — no dict allocation or re-serialization
+# per probe.
+_HEALTH_BYTES = json.dumps(
+    {
+        "status": "ok",
+        "service": "business_backend",
+        "version": "1.0.0",
+    }
+).encode()
+_ROOT_BYTES = json.dumps(
+    {
+        "service": "Business Backend API",
+        "version": "1.0.0",
+        "graphql_endpoint": "/graphql",
+        "graphiql_ui": "/graphql (browser)",
+        "product_recognition_endpoints": ["/register", "/predict", "/preview_keypoints"],
+        "health_check": "/health",
+        "docs": "/docs",
+    }
+).encode()
+
+
+class WildcardCORSMiddleware:
+    """
+    Minimal ASGI middleware for the allow-everything CORS policy.
+
+    Starlette's CORSMiddleware rebuilds header lists and checks origin
+    membership in Python on every request; with a wildcard policy the
+    answer never changes, so preflights get a canned response and other
+    responses just append the precomputed header pairs.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and any(
+            name == b"access-control-request-method"
+            for name, _ in scope["headers"]
+        ):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": _CORS_PREFLIGHT_HEADERS,
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    *_CORS_HEADERS,
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
+@functools.cache
+def configure_logging() -> None:
+    """
+    Configure the loguru sink once for the whole process.
+
+    enqueue=True hands records to a background writer thread, so request
+    handlers never block on stderr I/O.
+    """
+    settings = get_business_settings()
+    logger.remove()
+    logger.add(sys.stderr, level=settings.log_level.upper(), enqueue=True)
 
 
 def create_business_backend_app() -> FastAPI:
@@ -37,6 +134,8 @@ def create_business_backend_app() -> FastAPI:
     Returns:
         FastAPI application with GraphQL endpoint
     """
+    configure_logging()
+
     app = FastAPI(
         title="Business Backend API",
         description="Provides FAQs and Documents from CSV files via GraphQL",
@@ -51,14 +150,8 @@ def create_business_backend_app() -> FastAPI:
     name="imagenes_productos",
 )
 
-    # Configure CORS
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=["*"],  # Allows all origins
-        allow_credentials=True,
-        allow_methods=["*"],  # Allows all methods
-        allow_headers=["*"],  # Allows all headers
-    )
+    # Configure CORS (wildcard policy, precomputed headers)
+    app.add_middleware(WildcardCORSMiddleware)
 
     # Create business_backend's own DI container
     container = create_business_container()
@@ -69,6 +162,9 @@ def create_business_backend_app() -> FastAPI:
         query=BusinessQuery,
         extensions=[
             AioInjectExtension(container),  # Uses business_backend's container
+            ParserCache(maxsize=256),  # Skip re-lexing/parsing hot query documents
+            ValidationCache(maxsize=256),  # Skip re-validating hot query documents
+            ResponseCache(),  # Serve repeated read queries from memory
         ],
     )
     logger.info("✅ Business Backend GraphQL schema created")
@@ -83,28 +179,32 @@ def create_business_backend_app() -> FastAPI:
     # Register Product Recognition Router (from routes2.py)
     app.include_router(product_router)
 
+    @app.on_event("startup")
+    async def warm_database() -> None:
+        """Open the pool before the first request hits it."""
+        try:
+            engine = get_engine()
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            logger.info("✅ Database connection pool warmed")
+        except Exception as e:
+            logger.warning("Database warm-up failed: {}", e)
+
     # Health check endpoint
     @app.get("/health")
     async def health():
         """Health check for business backend service."""
-        return {
-            "status": "ok",
-            "service": "business_backend",
-            "version": "1.0.0",
-        }
+        return Response(
+            content=_HEALTH_BYTES,
+            media_type="application/json",
+            # Lets LB/k8s probes cache in front of the app.
+            headers={"Cache-Control": "public, max-age=5"},
+        )
 
     @app.get("/")
     async def root():
         """Root endpoint with service information."""
-        return {
-            "service": "Business Backend API",
-            "version": "1.0.0",
-            "graphql_endpoint": "/graphql",
-            "graphiql_ui": "/graphql (browser)",
-            "product_recognition_endpoints": ["/register", "/predict", "/preview_keypoints"],
-            "health_check": "/health",
-            "docs": "/docs",
-        }
+        return Response(content=_ROOT_BYTES, media_type="application/json")
 
     logger.info("✅ Business Backend FastAPI app created")
     return app
@@ -139,9 +239,24 @@ if __name__ == "__main__":
     logger.info(f"📊 GraphiQL UI: http://localhost:{port}/graphql")
     logger.info(f"📖 API Docs: http://localhost:{port}/docs")
 
+    # Prefer uvloop + httptools when installed; both are drop-in C
+    # replacements for the default event loop / HTTP parser.
+    uvicorn_kwargs: dict = {}
+    try:
+        import httptools  # noqa: F401
+        import uvloop  # noqa: F401
+
+        uvicorn_kwargs.update(loop="uvloop", http="httptools")
+    except ImportError:
+        pass
+
     uvicorn.run(
         app,
         host=host,
         port=port,
         log_level="info",
+        # Access logging blocks the loop on stdout; request-level logs
+        # already go through the non-blocking loguru sink.
+        access_log=False,
+        **uvicorn_kwargs,
     )
@@ -5,9 +5,12 @@ Example implementation of BaseModel for image classification.
 Supports Keras/TensorFlow and PyTorch models.
 """
 
+import os
 from typing import Any
 from pathlib import Path
 
+import numpy as np
+
 from ml.models.base import BaseModel
 
 
@@ -21,6 +24,10 @@ class ImageClassifier(BaseModel):
     - TensorFlow SavedModel format (directory)
     - PyTorch (.pt, .pth)
     - ONNX (.onnx)
+
+    The ONNX path is the only one implemented so far; it runs batched
+    inference through onnxruntime so a whole batch costs one C-level
+    session.run() instead of a Python loop of single predictions.
     """
 
     model_type: str = "image"
@@ -30,6 +37,7 @@ class ImageClassifier(BaseModel):
         """Initialize classifier."""
         super().__init__()
         self._class_labels: list[str] = []
+        self._input_name: str | None = None
 
     async def load(self, path: str | Path) -> None:
         """
@@ -37,12 +45,22 @@ class ImageClassifier(BaseModel):
 
         Args:
             path: Path to model file or directory
+
+        Raises:
+            NotImplementedError: For formats without a loader yet
         """
-        # Here your code for:
-        # 1. Detect model format (h5, json+weights, savedmodel, pt, onnx)
-        # 2. Load model using appropriate framework
-        # 3. Set self._model and self._is_loaded
-        pass
+        path = Path(path)
+        if path.suffix == ".onnx":
+            await self._load_onnx(path)
+        elif path.suffix == ".h5":
+            await self._load_keras_h5(path)
+        elif path.suffix == ".json":
+            await self._load_keras_json_weights(path)
+        elif path.suffix in (".pt", ".pth"):
+            await self._load_pytorch(path)
+        else:
+            raise NotImplementedError(f"Unsupported model format: {path.suffix}")
+        self._model_path = path
 
     async def predict(self, data: Any) -> dict[str, Any]:
         """
@@ -54,27 +72,48 @@ class ImageClassifier(BaseModel):
         Returns:
             Dict with prediction, confidence, and metadata
         """
-        # Here your code for:
-        # 1. Ensure model is loaded
-        # 2. Add batch dimension if needed
-        # 3. Run model.predict()
-        # 4. Get top prediction index and confidence
-        # 5. Map to class label if available
-        # 6. Return formatted result
-        pass
+        results = await self.predict_batch([data])
+        return results[0]
 
     async def predict_batch(self, data_list: list[Any]) -> list[dict[str, Any]]:
         """
         Optimized batch prediction.
 
+        Stacks all inputs into one contiguous float32 batch and runs a
+        single session.run(), so onnxruntime's SIMD kernels see the whole
+        batch at once instead of N single-image calls.
+
         Args:
             data_list: List of preprocessed images
 
         Returns:
             List of prediction results
         """
-        # Here your code for optimized batch inference
-        pass
+        if not self._is_loaded:
+            raise RuntimeError("Model not loaded; call load() first")
+        if not data_list:
+            return []
+
+        batch = np.stack(data_list).astype(np.float32, copy=False)
+        outputs = self._model.run(None, {self._input_name: batch})[0]
+
+        top = np.argmax(outputs, axis=1)
+        results = []
+        for row, idx in zip(outputs, top):
+            idx = int(idx)
+            label = (
+                self._class_labels[idx]
+                if idx < len(self._class_labels)
+                else str(idx)
+            )
+            results.append(
+                {
+                    "prediction": label,
+                    "confidence": float(row[idx]),
+                    "metadata": {"class_index": idx},
+                }
+            )
+        return results
 
     def set_class_labels(self, labels: list[str]) -> None:
         """
@@ -92,19 +131,46 @@ class ImageClassifier(BaseModel):
     async def _load_keras_h5(self, path: Path) -> None:
         """Load Keras H5 model."""
         # Here your code for loading Keras H5 model
-        pass
+        raise NotImplementedError("Keras H5 loading not implemented yet")
 
     async def _load_keras_json_weights(self, json_path: Path) -> None:
         """Load Keras model from JSON architecture + H5 weights."""
         # Here your code for loading JSON + weights (like Django CNN project)
-        pass
+        raise NotImplementedError("Keras JSON+weights loading not implemented yet")
 
     async def _load_pytorch(self, path: Path) -> None:
         """Load PyTorch model."""
         # Here your code for loading PyTorch model
-        pass
+        raise NotImplementedError("PyTorch loading not implemented yet")
 
     async def _load_onnx(self, path: Path) -> None:
-        """Load ONNX model."""
-        # Here your code for loading ONNX model
-        pass
+        """
+        Load ONNX model via onnxruntime.
+
+        Uses all graph optimizations, every available CPU core for
+        intra-op parallelism, and the CUDA provider when the runtime
+        exposes one (falling back to CPU otherwise).
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError(
+                "onnxruntime is required to load .onnx models"
+            ) from e
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.intra_op_num_threads = os.cpu_count() or 1
+        opts.enable_cpu_mem_arena = True
+
+        available = ort.get_available_providers()
+        providers = [
+            p
+            for p in ("CUDAExecutionProvider", "CPUExecutionProvider")
+            if p in available
+        ] or ["CPUExecutionProvider"]
+
+        session = ort.InferenceSession(str(path), sess_options=opts, providers=providers)
+        self._model = session
+        self._input_name = session.get_inputs()[0].name
+        self._is_loaded = True
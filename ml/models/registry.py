@@ -5,6 +5,8 @@ Manages ML model registration, loading, and lifecycle.
 Follows MLflow registry pattern for model management.
 """
 
+import asyncio
+import weakref
 from typing import Any
 from pathlib import Path
 from dataclasses import dataclass, field
@@ -48,7 +50,17 @@ class ModelRegistry:
     def __init__(self) -> None:
         """Initialize empty registry."""
         self._registry: dict[str, ModelInfo] = {}
-        self._loaded_models: dict[str, BaseModel] = {}
+        # Weak values: an idle model with no outside references gets
+        # garbage-collected instead of occupying RAM for the process
+        # lifetime. pin() keeps a strong reference for hot models.
+        self._loaded_models: weakref.WeakValueDictionary[str, BaseModel] = (
+            weakref.WeakValueDictionary()
+        )
+        self._pinned: dict[str, BaseModel] = {}
+        # One lock per model so loading model A never blocks model B;
+        # _locks_guard only protects the tiny lock-creation window.
+        self._load_locks: dict[str, asyncio.Lock] = {}
+        self._locks_guard = asyncio.Lock()
 
     def register(
         self,
@@ -70,8 +82,14 @@ class ModelRegistry:
             version: Model version string
             metadata: Additional model metadata
         """
-        # Here your code for registering model in registry
-        pass
+        self._registry[name] = ModelInfo(
+            name=name,
+            model_class=model_class,
+            model_path=model_path,
+            stage=stage,
+            version=version,
+            metadata=metadata or {},
+        )
 
     def unregister(self, name: str) -> None:
         """
@@ -80,8 +98,10 @@ class ModelRegistry:
         Args:
             name: Model identifier
         """
-        # Here your code for unregistering model
-        pass
+        self._registry.pop(name, None)
+        self._loaded_models.pop(name, None)
+        self._pinned.pop(name, None)
+        self._load_locks.pop(name, None)
 
     async def load(self, name: str) -> BaseModel:
         """
@@ -96,13 +116,40 @@ class ModelRegistry:
         Raises:
             KeyError: If model not registered
         """
-        # Here your code for:
-        # 1. Check if model is registered
-        # 2. Return cached model if already loaded
-        # 3. Instantiate model class
-        # 4. Load weights from path
-        # 5. Cache and return model
-        pass
+        if name not in self._registry:
+            raise KeyError(f"Model not registered: {name}")
+
+        # Fast path: already loaded, no locking at all.
+        model = self._loaded_models.get(name)
+        if model is not None:
+            return model
+
+        lock = await self._get_load_lock(name)
+        async with lock:
+            # Double-checked: another coroutine may have loaded it while
+            # we waited for this model's lock.
+            model = self._loaded_models.get(name)
+            if model is not None:
+                return model
+
+            info = self._registry[name]
+            model = info.model_class()
+            await model.load(info.model_path)
+            self._loaded_models[name] = model
+            return model
+
+    async def _get_load_lock(self, name: str) -> asyncio.Lock:
+        """
+        Get or create the per-model load lock.
+
+        Per-model locks mean two different models can load concurrently;
+        only duplicate loads of the *same* model serialize.
+        """
+        async with self._locks_guard:
+            lock = self._load_locks.get(name)
+            if lock is None:
+                lock = self._load_locks[name] = asyncio.Lock()
+            return lock
 
     async def unload(self, name: str) -> None:
         """
@@ -111,8 +158,36 @@ class ModelRegistry:
         Args:
             name: Model identifier
         """
-        # Here your code for unloading model
-        pass
+        self._pinned.pop(name, None)
+        model = self._loaded_models.pop(name, None)
+        if model is not None:
+            await model.unload()
+
+    async def pin(self, name: str) -> BaseModel:
+        """
+        Load a model and keep a strong reference to it.
+
+        Pinned models (e.g. production-stage ones) are exempt from the
+        weak-reference collection in _loaded_models.
+
+        Args:
+            name: Model identifier
+
+        Returns:
+            Loaded model instance
+        """
+        model = await self.load(name)
+        self._pinned[name] = model
+        return model
+
+    def unpin(self, name: str) -> None:
+        """
+        Drop the strong reference, making the model collectable again.
+
+        Args:
+            name: Model identifier
+        """
+        self._pinned.pop(name, None)
 
     async def reload(self, name: str) -> BaseModel:
         """
@@ -124,8 +199,8 @@ class ModelRegistry:
         Returns:
             Reloaded model instance
         """
-        # Here your code for reloading model
-        pass
+        await self.unload(name)
+        return await self.load(name)
 
     def get_info(self, name: str) -> ModelInfo | None:
         """
@@ -149,8 +224,10 @@ class ModelRegistry:
         Returns:
             List of ModelInfo
         """
-        # Here your code for listing models
-        pass
+        infos = list(self._registry.values())
+        if stage is not None:
+            infos = [info for info in infos if info.stage == stage]
+        return infos
 
     def is_loaded(self, name: str) -> bool:
         """
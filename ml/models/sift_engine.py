@@ -1,43 +1,338 @@
+import asyncio
 import cv2
 import numpy as np
+import functools
 import joblib
 import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from loguru import logger
+
+# faiss is optional: when present, matching uses an HNSW index instead
+# of the exhaustive GEMM pass
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+# Above this pixel count, single-threaded detectAndCompute dominates the
+# request; register/identify switch to the tiled parallel detector.
+_TILED_MIN_PIXELS = 2_000_000
+
+# Immutable snapshot of the searchable bank. Register and identify run
+# on worker threads, so readers grab one reference and see a consistent
+# (names, desc, owners, sq, index) set while registrations publish a
+# replacement with a single attribute swap.
+_Bank = namedtuple("_Bank", "names desc owners sq index")
+_EMPTY_BANK = _Bank((), None, None, None, None)
+
 class SIFTEngine:
     def __init__(self, storage_path="sift_data.pkl"):
         self.storage_path = storage_path
+        # Fast-load sidecar: the same data as the pickle, stored as flat
+        # numpy arrays (see _save_bank_npz) so startup skips rebuilding a
+        # Python object graph descriptor by descriptor. The descriptor
+        # matrix lives in its own .npy so it can be opened memory-mapped.
+        self.npz_path = str(Path(storage_path).with_suffix(".npz"))
+        self.desc_path = str(Path(storage_path).with_suffix(".desc.npy"))
+        # Default detector, used for queries; parameterized registration
+        # detectors come from the _get_sift cache so identify never
+        # inherits whatever thresholds the last register happened to use.
         self.sift = cv2.SIFT_create()
         # Storage format: { "product_name": [descriptors_1, descriptors_2, ...] }
         # Or simpler: { "product_name": descriptors } if User implies 1 reference image implies 1 descriptor set
-        self.database = {} 
+        self.database = {}
+        # Searchable view of the database: all descriptors stacked into one
+        # contiguous float32 matrix plus a row -> product mapping (and
+        # cached row norms / optional faiss index), rebuilt on load and
+        # on register so matching can query one structure instead of
+        # walking the dict product by product. Published as an immutable
+        # _Bank snapshot; writers are serialized by _bank_lock.
+        self._bank = _EMPTY_BANK
+        self._bank_lock = threading.RLock()
+        # Serializes background MLflow snapshots so runs stay ordered
+        self._mlflow_lock = threading.Lock()
         self.load_database()
 
     def load_database(self):
+        if self._load_bank_npz():
+            return
         if os.path.exists(self.storage_path):
             try:
                 self.database = joblib.load(self.storage_path)
-                print(f"Loaded SIFT database with {len(self.database)} products.")
+                logger.info("Loaded SIFT database with {} products.", len(self.database))
             except Exception as e:
-                print(f"Failed to load database: {e}")
+                logger.error("Failed to load database: {}", e)
                 self.database = {}
         else:
             self.database = {}
+        self._rebuild_bank()
+        if self.database:
+            # Refresh the sidecar so the next load takes the fast path
+            # (e.g. right after /mlflow/restore replaced the pickle)
+            self._save_bank_npz()
 
-    def save_database(self):
-        joblib.dump(self.database, self.storage_path)
-        print("SIFT database saved.")
+    def _load_bank_npz(self):
+        """
+        Hydrate database + bank from the npz sidecar if it is current.
 
-        # MLflow logging
+        Returns True on success. The sidecar is considered stale when the
+        pickle is newer (a restore copied a fresh pickle over it), in
+        which case the caller falls back to the pickle path.
+        """
+        if not (os.path.exists(self.npz_path) and os.path.exists(self.desc_path)):
+            return False
+        if (
+            os.path.exists(self.storage_path)
+            and os.path.getmtime(self.npz_path) < os.path.getmtime(self.storage_path)
+        ):
+            return False
         try:
-            import mlflow
-            mlflow.set_experiment("SIFT_Product_Registry")
-            with mlflow.start_run():
-                mlflow.log_artifact(self.storage_path)
-                mlflow.log_metric("product_count", len(self.database))
-                print("Logged version to MLflow.")
+            data = np.load(self.npz_path)
+            offsets = data["offsets"]
+            names = [str(n) for n in data["names"]]
+            # Memory-mapped open: O(1) regardless of bank size, pages are
+            # faulted in lazily as matching touches them
+            descriptors = np.load(self.desc_path, mmap_mode="r")
         except Exception as e:
-            print(f"MLflow logging failed: {e}")
+            logger.warning("Failed to load npz sidecar: {}", e)
+            return False
+
+        if len(descriptors):
+            # Matching needs float32; materialize a working copy here so
+            # the on-disk bank (and self.database) stay uint8 RootSIFT
+            bank = np.ascontiguousarray(descriptors, dtype=np.float32)
+            # Row norms computed once at load; identify reuses them
+            bank_sq = np.einsum("ij,ij->i", bank, bank)
+        else:
+            bank = None
+            bank_sq = None
+        counts = np.diff(offsets)
+        owners = (
+            np.repeat(np.arange(len(names), dtype=np.int32), counts)
+            if len(names)
+            else None
+        )
+        # Per-product entries are zero-copy uint8 views into the mmapped
+        # file, so the next pickle dump stays quantized
+        self.database = {
+            name: descriptors[offsets[i]:offsets[i + 1]]
+            for i, name in enumerate(names)
+        }
+        self._bank = _Bank(
+            tuple(names), bank, owners, bank_sq, self._build_index(bank)
+        )
+        logger.info("Loaded SIFT database with {} products (npz).", len(self.database))
+        return True
+
+    def _save_bank_npz(self):
+        """
+        Write the descriptor bank as flat arrays next to the pickle.
+
+        One stacked (N_total, 128) uint8 RootSIFT matrix (own .npy,
+        opened with mmap on load) plus offsets and names in the npz:
+        loading it back is an O(1) mmap open instead of reconstructing
+        every descriptor array through pickle. The bank persists in the
+        same uint8 form the pickle stores, so reload cycles never
+        inflate it back to float32. Both files are swapped in atomically.
+        """
+        blocks = []
+        names = []
+        counts = []
+        for name, des_ref in self.database.items():
+            if des_ref is None or len(des_ref) == 0:
+                continue
+            blocks.append(np.asarray(des_ref, dtype=np.uint8))
+            names.append(name)
+            counts.append(len(des_ref))
+
+        if not blocks:
+            for path in (self.npz_path, self.desc_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+        # Write-then-rename so a concurrent load (or a crash mid-save)
+        # never observes a half-written bank; descriptors land first so
+        # the metadata never points at missing data
+        tmp_desc = self.desc_path + ".tmp"
+        with open(tmp_desc, "wb") as f:
+            np.save(f, np.vstack(blocks))
+        os.replace(tmp_desc, self.desc_path)
+
+        tmp_meta = self.npz_path + ".tmp"
+        with open(tmp_meta, "wb") as f:
+            np.savez(f, offsets=offsets, names=np.array(names))
+        os.replace(tmp_meta, self.npz_path)
+
+    def _rebuild_bank(self):
+        """
+        Hydrate the searchable descriptor bank from self.database.
+
+        Stacks every product's descriptors into a single (N_total, 128)
+        float32 matrix with a parallel row -> product index, so queries
+        hit one contiguous structure instead of per-product arrays. The
+        finished snapshot is published with one assignment.
+        """
+        with self._bank_lock:
+            names = []
+            blocks = []
+            owners = []
+            for name, des_ref in self.database.items():
+                if des_ref is None or len(des_ref) == 0:
+                    continue
+                owners.append(np.full(len(des_ref), len(names), dtype=np.int32))
+                blocks.append(np.asarray(des_ref, dtype=np.float32))
+                names.append(name)
+
+            if not blocks:
+                self._bank = _EMPTY_BANK
+                return
+            desc = np.ascontiguousarray(np.vstack(blocks))
+            self._bank = _Bank(
+                tuple(names),
+                desc,
+                np.concatenate(owners),
+                np.einsum("ij,ij->i", desc, desc),
+                self._build_index(desc),
+            )
+
+    def _append_to_bank(self, name, des_ref):
+        """
+        Append one new product's descriptors to the bank.
+
+        Registration work scales with the new product's descriptor count
+        instead of restacking every registered product: fresh arrays are
+        built from the previous snapshot (never mutating it, so in-flight
+        queries keep a consistent view) and swapped in atomically.
+        Re-registering an existing name falls back to a full rebuild,
+        since its old rows must be dropped from the middle of the stack.
+        """
+        with self._bank_lock:
+            old = self._bank
+            if name in old.names:
+                self._rebuild_bank()
+                return
+
+            block = np.ascontiguousarray(np.asarray(des_ref, dtype=np.float32))
+            block_sq = np.einsum("ij,ij->i", block, block)
+            owner = np.full(len(block), len(old.names), dtype=np.int32)
+            names = (*old.names, name)
+            if old.desc is None:
+                self._bank = _Bank(
+                    names, block, owner, block_sq, self._build_index(block)
+                )
+                return
+
+            desc = np.ascontiguousarray(np.vstack((np.asarray(old.desc), block)))
+            index = old.index
+            if index is not None:
+                # HNSW supports incremental adds; the index keeps
+                # referencing rows in registration order, matching the
+                # owner array. Readers of older snapshots mask out rows
+                # beyond their own bank length.
+                try:
+                    index.add(block)
+                except Exception as e:
+                    logger.warning("faiss incremental add failed, rebuilding: {}", e)
+                    index = self._build_index(desc)
+            self._bank = _Bank(
+                names,
+                desc,
+                np.concatenate((old.owners, owner)),
+                np.concatenate((old.sq, block_sq)),
+                index,
+            )
+
+    def _build_index(self, desc):
+        """Build a faiss HNSW index over `desc` when faiss is installed."""
+        if faiss is None or desc is None:
+            return None
+        try:
+            index = faiss.IndexHNSWFlat(128, 32)
+            index.add(desc)
+            return index
+        except Exception as e:
+            logger.warning("Failed to build faiss index, using GEMM matching: {}", e)
+            return None
+
+    def save_database(self):
+        # Protocol 5 hands ndarray buffers to the pickler out-of-band
+        # instead of copying them through the byte stream
+        joblib.dump(self.database, self.storage_path, protocol=5)
+        self._save_bank_npz()
+        logger.debug("SIFT database saved.")
+
+        # MLflow copies the whole pickle into its artifact store; do that
+        # off the registration path
+        threading.Thread(target=self._mlflow_snapshot, daemon=True).start()
+
+    def _mlflow_snapshot(self):
+        """
+        Log the current pickle + product count as an MLflow run.
+
+        Runs on a background thread; the lock keeps concurrent snapshots
+        from interleaving so run order follows save order.
+        """
+        with self._mlflow_lock:
+            try:
+                import mlflow
+                mlflow.set_experiment("SIFT_Product_Registry")
+                with mlflow.start_run():
+                    mlflow.log_artifact(self.storage_path)
+                    mlflow.log_metric("product_count", len(self.database))
+                    logger.debug("Logged version to MLflow.")
+            except Exception as e:
+                logger.warning("MLflow logging failed: {}", e)
+
+    @staticmethod
+    def _to_gray(image):
+        """
+        Return a single-channel view/conversion of `image`.
+
+        Callers that already hold grayscale (e.g. the /predict path
+        decodes with IMREAD_REDUCED_GRAYSCALE_2) skip the O(H*W)
+        cvtColor allocation entirely.
+        """
+        if image.ndim == 2:
+            return image
+        if image.shape[2] == 1:
+            return image[:, :, 0]
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _get_sift(contrast_threshold, edge_threshold):
+        """
+        Cached parameterized detector.
+
+        cv2.SIFT_create allocates the scale-space pyramid machinery, so
+        repeated registrations with the same thresholds reuse one
+        detector instead of rebuilding it per call.
+        """
+        return cv2.SIFT_create(
+            contrastThreshold=contrast_threshold, edgeThreshold=edge_threshold
+        )
+
+    @staticmethod
+    def _root_sift(descriptors):
+        """
+        RootSIFT transform: L1-normalize then take the elementwise square
+        root (Hellinger kernel), scaled and clipped to the stored uint8
+        range. Comparing RootSIFT vectors with L2 matches better than raw
+        SIFT, and the transform makes 1-byte quantization safe.
+        """
+        d = np.asarray(descriptors, dtype=np.float32)
+        d = d / (d.sum(axis=1, keepdims=True) + 1e-7)
+        np.sqrt(d, out=d)
+        d *= 512.0
+        np.clip(d, 0.0, 255.0, out=d)
+        return d
 
     def register_product(self, name, image_bgr, mask=None, contrast_threshold=0.04, edge_threshold=10):
         """
@@ -45,33 +340,133 @@ class SIFTEngine:
         contrast_threshold: The contrast threshold used to filter out weak features.
         edge_threshold: The threshold used to filter out edge-like features.
         """
-        gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
-        
-        # Configure SIFT
-        if contrast_threshold != 0.04 or edge_threshold != 10:
-            self.sift = cv2.SIFT_create(contrastThreshold=contrast_threshold, edgeThreshold=edge_threshold)
+        gray = self._to_gray(image_bgr)
+
+        if gray.size >= _TILED_MIN_PIXELS:
+            keypoints, descriptors, _ = self.detect_keypoints_tiled(
+                gray, mask, contrast_threshold, edge_threshold
+            )
+            if len(keypoints) == 0:
+                descriptors = None
         else:
-            # Reset to default if matches default, or just create new one
-            self.sift = cv2.SIFT_create()
+            sift = self._get_sift(contrast_threshold, edge_threshold)
+            keypoints, descriptors = sift.detectAndCompute(gray, mask)
 
-        keypoints, descriptors = self.sift.detectAndCompute(gray, mask)
-        
         if descriptors is None:
             return False, "No features detected in image."
-            
-        self.database[name] = descriptors
+
+        # Stored as uint8 RootSIFT: 4x smaller than raw float32
+        self.database[name] = self._root_sift(descriptors).astype(np.uint8)
+        self._append_to_bank(name, self.database[name])
         self.save_database()
         return True, f"Registered '{name}' with {len(keypoints)} features."
 
+    def register_product_precomputed(self, name, keypoints, descriptors):
+        """
+        Store already-computed features for a product.
+
+        Skips detectAndCompute when the caller already detected keypoints
+        earlier in the request (e.g. the auto-threshold path), so
+        registration costs no additional SIFT pass.
+        """
+        if descriptors is None or len(descriptors) == 0:
+            return False, "No features detected in image."
+
+        self.database[name] = self._root_sift(descriptors).astype(np.uint8)
+        self._append_to_bank(name, self.database[name])
+        self.save_database()
+        return True, f"Registered '{name}' with {len(keypoints)} features."
+
+    def detect_keypoints_raw(self, image_bgr, mask=None, contrast_threshold=0.001, edge_threshold=10):
+        """
+        Detect keypoints once at a very low contrast threshold.
+
+        Returns (keypoints, descriptors, responses). Because keypoint
+        count is monotonic in the contrast threshold, detecting a
+        superset once and filtering by each keypoint's response replaces
+        re-running the whole SIFT pyramid per candidate threshold.
+        """
+        gray = self._to_gray(image_bgr)
+        sift = self._get_sift(contrast_threshold, edge_threshold)
+        keypoints, descriptors = sift.detectAndCompute(gray, mask)
+        responses = np.fromiter((kp.response for kp in keypoints), dtype=np.float32, count=len(keypoints))
+        return keypoints, descriptors, responses
+
+    def detect_keypoints_tiled(self, image_bgr, mask=None, contrast_threshold=0.001,
+                               edge_threshold=10, grid=(2, 2)):
+        """
+        Detect keypoints on image tiles in parallel.
+
+        SIFT releases the GIL, so splitting a large image into a grid and
+        detecting per tile in a thread pool scales with core count.
+        Keypoint coordinates are remapped by tile offset before merging;
+        features straddling tile seams may be missed, which is fine for
+        threshold search on large images. Returns the same
+        (keypoints, descriptors, responses) tuple as detect_keypoints_raw.
+        """
+        gray = self._to_gray(image_bgr)
+        rows, cols = grid
+        h, w = gray.shape
+
+        def detect_tile(r, c):
+            y0, y1 = h * r // rows, h * (r + 1) // rows
+            x0, x1 = w * c // cols, w * (c + 1) // cols
+            tile_mask = mask[y0:y1, x0:x1] if mask is not None else None
+            # One detector per tile: cv2.SIFT is not documented re-entrant
+            sift = cv2.SIFT_create(
+                contrastThreshold=contrast_threshold, edgeThreshold=edge_threshold
+            )
+            kps, desc = sift.detectAndCompute(gray[y0:y1, x0:x1], tile_mask)
+            for kp in kps:
+                kp.pt = (kp.pt[0] + x0, kp.pt[1] + y0)
+            return kps, desc
+
+        cells = [(r, c) for r in range(rows) for c in range(cols)]
+        with ThreadPoolExecutor(max_workers=len(cells)) as pool:
+            results = list(pool.map(lambda cell: detect_tile(*cell), cells))
+
+        keypoints = []
+        blocks = []
+        for kps, desc in results:
+            if desc is None:
+                continue
+            keypoints.extend(kps)
+            blocks.append(desc)
+
+        if not blocks:
+            return [], None, np.empty(0, dtype=np.float32)
+
+        descriptors = np.vstack(blocks)
+        responses = np.fromiter(
+            (kp.response for kp in keypoints), dtype=np.float32, count=len(keypoints)
+        )
+        return keypoints, descriptors, responses
+
+    @staticmethod
+    def filter_keypoints_by_response(keypoints, descriptors, responses, target):
+        """
+        Keep roughly the `target` strongest keypoints by response.
+
+        One O(N) selection (np.partition) instead of bisecting the
+        contrast threshold with a full re-detection per step.
+        """
+        if len(keypoints) <= target:
+            return list(keypoints), descriptors
+
+        cutoff = np.partition(responses, -target)[-target]
+        keep = np.flatnonzero(responses >= cutoff)[:target]
+        kept_kps = [keypoints[i] for i in keep]
+        kept_desc = descriptors[keep] if descriptors is not None else None
+        return kept_kps, kept_desc
+
     def detect_keypoints_vis(self, image_bgr, mask=None, contrast_threshold=0.04, edge_threshold=10):
         """
         Return image with keypoints drawn for visualization.
         """
-        gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
-        
-        # Temp SIFT with params
-        sift_temp = cv2.SIFT_create(contrastThreshold=contrast_threshold, edgeThreshold=edge_threshold)
-        
+        gray = self._to_gray(image_bgr)
+
+        sift_temp = self._get_sift(contrast_threshold, edge_threshold)
+
         keypoints = sift_temp.detect(gray, mask)
         
         vis_img = cv2.drawKeypoints(image_bgr, keypoints, None, flags=cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
@@ -81,45 +476,90 @@ class SIFTEngine:
         """
         Compare query image against all registered products.
         Returns the best match label.
+
+        Matching runs as one BLAS pass over the stacked descriptor bank:
+        pairwise squared L2 via ||R||^2 + ||Q||^2 - 2*R.Q^T, top-2 per
+        reference row with argpartition, then a vectorized Lowe ratio
+        test — instead of one BFMatcher.knnMatch per registered product.
         """
-        gray_query = cv2.cvtColor(query_image_bgr, cv2.COLOR_BGR2GRAY)
-        kp_q, des_q = self.sift.detectAndCompute(gray_query, None)
-        
-        if des_q is None:
+        # Accept already-gray input: callers that decode grayscale skip a
+        # redundant color decode + conversion entirely
+        gray_query = self._to_gray(query_image_bgr)
+        if gray_query.size >= _TILED_MIN_PIXELS:
+            kp_q, des_q, _ = self.detect_keypoints_tiled(
+                gray_query, contrast_threshold=0.04, edge_threshold=10
+            )
+        else:
+            kp_q, des_q = self.sift.detectAndCompute(gray_query, None)
+
+        # One snapshot: every array below belongs to the same bank even
+        # if a registration publishes a replacement mid-query
+        bank = self._bank
+        if des_q is None or len(des_q) < 2 or bank.desc is None:
             return None, 0
 
-        bf = cv2.BFMatcher()
-        best_label = None
-        max_matches = 0
-        
-        # Iterate all products
-        for name, des_ref in self.database.items():
-            if des_ref is None: 
-                continue
-                
-            # KNN Match
-            matches = bf.knnMatch(des_ref, des_q, k=2)
-            
-            # Ratio Test
-            good = []
-            for m, n in matches:
-                if m.distance < 0.75 * n.distance:
-                    good.append(m)
-            
-            if len(good) > max_matches:
-                max_matches = len(good)
-                best_label = name
+        # Queries get the same RootSIFT transform the stored bank uses
+        Q = np.ascontiguousarray(self._root_sift(des_q))
+        R = bank.desc
+
+        if bank.index is not None:
+            # ANN path: top-2 registry neighbours per query descriptor,
+            # ratio test on the (already squared) HNSW distances. The
+            # lock keeps the search from interleaving with an
+            # incremental add on the same index.
+            with self._bank_lock:
+                dist, neighbours = bank.index.search(Q, 2)
+            good = dist[:, 0] < (0.75 ** 2) * dist[:, 1]
+            # The shared index may already hold rows registered after
+            # this snapshot; ignore neighbours beyond our owner array
+            good &= neighbours[:, 0] < len(bank.owners)
+            counts = np.bincount(
+                bank.owners[neighbours[good, 0]], minlength=len(bank.names)
+            )
+        else:
+            # Pairwise squared distances in a single sgemm; bank row
+            # norms come precomputed from the last rebuild/append
+            d2 = (
+                bank.sq[:, None]
+                + np.einsum("ij,ij->i", Q, Q)[None, :]
+                - 2.0 * (R @ Q.T)
+            )
+
+            # Two nearest query descriptors per reference row (unordered)
+            idx = np.argpartition(d2, 1, axis=1)[:, :2]
+            near = np.take_along_axis(d2, idx, axis=1)
+            d1 = near.min(axis=1)
+            d2_nd = near.max(axis=1)
+
+            # Lowe ratio test on squared distances: d1 < (0.75 * d2)^2
+            good = d1 < (0.75 ** 2) * d2_nd
+
+            counts = np.bincount(bank.owners[good], minlength=len(bank.names))
+        if counts.size == 0:
+            return None, 0
+
+        best = int(counts.argmax())
+        max_matches = int(counts[best])
 
         if max_matches >= min_match_count:
-            return best_label, max_matches
+            return bank.names[best], max_matches
         else:
             return None, max_matches
 
-# Singleton
-_sift_instance = None
+    async def identify_product_async(self, query_image_bgr, min_match_count=10):
+        """
+        Event-loop-friendly wrapper around identify_product.
+
+        SIFT detection and matching hold a core for hundreds of ms;
+        running them in a worker thread keeps the loop serving other
+        requests in the meantime (OpenCV and BLAS release the GIL).
+        """
+        return await asyncio.to_thread(
+            self.identify_product, query_image_bgr, min_match_count
+        )
 
+# Singleton per storage path: the cache replaces the old global guard
+# and stops repeated calls from re-loading the registry from disk
+@functools.cache
 def get_sift_engine(storage_path="sift_data.pkl"):
-    global _sift_instance
-    if _sift_instance is None:
-        _sift_instance = SIFTEngine(storage_path)
-    return _sift_instance
+    return SIFTEngine(storage_path)
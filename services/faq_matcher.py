@@ -0,0 +1,133 @@
+"""
+Fast-path FAQ matching for Business Backend.
+
+Compiles every FAQ pattern for a tenant into a single regex alternation
+at build time, so each incoming message is classified with one scan of
+the text instead of looping over every pattern list per request.
+"""
+
+import re
+from pathlib import Path
+
+from loguru import logger
+
+from agent.domain.faq_data_models import FAQData
+
+
+class FAQMatcher:
+    """Matches messages against all tenant FAQ patterns in one pass."""
+
+    def __init__(self, faq_data: FAQData) -> None:
+        """
+        Build the combined pattern automaton from tenant FAQ data.
+
+        The CSV patterns are regexes themselves (anchors, alternations,
+        wildcards), so each one becomes a named alternative in the
+        combined expression; the winning group name maps the match back
+        to its (category, response).
+
+        Args:
+            faq_data: Parsed FAQ data for one tenant
+        """
+        # lowercase pattern -> (category, response); first writer wins so
+        # the conversational categories take precedence over faq_items
+        self._responses: dict[str, tuple[str, str]] = {}
+
+        responses = faq_data.responses
+        self._add(faq_data.greeting_patterns, "greeting", responses.greeting)
+        self._add(faq_data.farewell_patterns, "farewell", responses.farewell)
+        self._add(faq_data.gratitude_patterns, "gratitude", responses.gratitude)
+        self._add(
+            faq_data.assistant_info_patterns,
+            "assistant_info",
+            responses.assistant_info,
+        )
+        self._add(
+            faq_data.help_request_patterns,
+            "help_request",
+            responses.help_request,
+        )
+        for item in faq_data.faq_items:
+            self._add(item.patterns, item.category, item.answer)
+
+        # Wrap each pattern as (?P<pN>...) so lastgroup identifies which
+        # alternative matched; insertion order keeps the conversational
+        # categories ahead of faq_items, same as the dict precedence
+        self._entries: list[tuple[str, str]] = []
+        self._compiled: list[tuple[re.Pattern, tuple[str, str]]] = []
+        parts = []
+        for pattern, payload in self._responses.items():
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                logger.warning("Skipping invalid FAQ pattern {!r}: {}", pattern, e)
+                continue
+            parts.append(f"(?P<p{len(self._entries)}>{pattern})")
+            self._entries.append(payload)
+            self._compiled.append((compiled, payload))
+
+        self._regex: re.Pattern | None = None
+        if parts:
+            try:
+                self._regex = re.compile("|".join(parts))
+            except re.error as e:
+                # e.g. clashing named groups inside patterns; fall back
+                # to scanning the per-pattern compilations in order
+                logger.warning("Combined FAQ pattern failed, scanning per pattern: {}", e)
+
+    def _add(self, patterns: list[str], category: str, response: str | None) -> None:
+        if not response:
+            return
+        for pattern in patterns:
+            normalized = pattern.strip().lower()
+            if normalized and normalized not in self._responses:
+                self._responses[normalized] = (category, response)
+
+    def match(self, message: str) -> tuple[str, str] | None:
+        """
+        Return (category, response) for the first pattern that matches
+        the message, or None when nothing matches.
+        """
+        text = message.lower()
+        if self._regex is not None:
+            found = self._regex.search(text)
+            if found is None or found.lastgroup is None:
+                return None
+            return self._entries[int(found.lastgroup[1:])]
+        for compiled, payload in self._compiled:
+            if compiled.search(text):
+                return payload
+        return None
+
+
+# Per-tenant matcher cache keyed by the source CSV's mtime: the compiled
+# alternation is reused across requests and rebuilt when the file changes.
+_matchers: dict[str, tuple[float, FAQMatcher]] = {}
+
+
+def _csv_mtime(tenant: str) -> float:
+    """mtime of the tenant's faqs.csv (same path TenantDataService reads)."""
+    path = Path(f"business_backend/data/{tenant}/faqs.csv")
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def get_cached_matcher(tenant: str) -> FAQMatcher | None:
+    """Return the cached matcher for a tenant unless its CSV changed."""
+    cached = _matchers.get(tenant)
+    if cached is None:
+        return None
+    mtime, matcher = cached
+    if mtime != _csv_mtime(tenant):
+        del _matchers[tenant]
+        return None
+    return matcher
+
+
+def build_matcher(tenant: str, faq_data: FAQData) -> FAQMatcher:
+    """Build, cache, and return the matcher for a tenant."""
+    matcher = FAQMatcher(faq_data)
+    _matchers[tenant] = (_csv_mtime(tenant), matcher)
+    return matcher
@@ -5,10 +5,12 @@ Provides CRUD operations for ProductStock using SQLAlchemy ORM.
 """
 from database.models.product_image import ProductImage
 
+from collections import defaultdict
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import load_only
 
 from database.models import ProductStock
 
@@ -30,6 +32,7 @@ class ProductService:
         limit: int = 50,
         offset: int = 0,
         active_only: bool = True,
+        columns: set[str] | None = None,
     ) -> list[ProductStock]:
         """
         List products with pagination.
@@ -38,6 +41,8 @@ class ProductService:
             limit: Maximum number of products to return
             offset: Number of products to skip
             active_only: If True, only return active products
+            columns: Optional set of column names to SELECT (narrows the
+                fetched row width); all columns are loaded when omitted
 
         Returns:
             List of ProductStock instances
@@ -45,6 +50,11 @@ class ProductService:
         async with self.session_factory() as session:
             query = select(ProductStock)
 
+            if columns:
+                query = query.options(
+                    load_only(*(getattr(ProductStock, name) for name in sorted(columns)))
+                )
+
             if active_only:
                 query = query.where(ProductStock.is_active == True)  # noqa: E712
 
@@ -53,18 +63,73 @@ class ProductService:
             result = await session.execute(query)
             return list(result.scalars().all())
 
-    async def get_product(self, product_id: UUID) -> ProductStock | None:
+    async def list_products_after(
+        self,
+        cursor_product_name: str | None = None,
+        cursor_id: UUID | None = None,
+        limit: int = 50,
+        active_only: bool = True,
+    ) -> list[ProductStock]:
+        """
+        List products using keyset (cursor) pagination.
+
+        Unlike OFFSET pagination, deep pages stay cheap: the WHERE clause
+        on (product_name, id) lets Postgres seek directly to the cursor
+        position via the index instead of scanning and discarding rows.
+
+        Args:
+            cursor_product_name: product_name of the last row of the previous page
+            cursor_id: id of the last row of the previous page
+            limit: Maximum number of products to return
+            active_only: If True, only return active products
+
+        Returns:
+            List of ProductStock instances after the cursor
+        """
+        async with self.session_factory() as session:
+            query = select(ProductStock)
+
+            if active_only:
+                query = query.where(ProductStock.is_active == True)  # noqa: E712
+
+            if cursor_product_name is not None and cursor_id is not None:
+                query = query.where(
+                    tuple_(ProductStock.product_name, ProductStock.id)
+                    > (cursor_product_name, cursor_id)
+                )
+
+            query = (
+                query.order_by(ProductStock.product_name, ProductStock.id)
+                .limit(limit)
+            )
+
+            result = await session.execute(query)
+            return list(result.scalars().all())
+
+    async def get_product(
+        self,
+        product_id: UUID,
+        columns: set[str] | None = None,
+    ) -> ProductStock | None:
         """
         Get a single product by ID.
 
         Args:
             product_id: UUID of the product
+            columns: Optional set of column names to SELECT; all columns
+                are loaded when omitted
 
         Returns:
             ProductStock instance or None if not found
         """
         async with self.session_factory() as session:
             query = select(ProductStock).where(ProductStock.id == product_id)
+
+            if columns:
+                query = query.options(
+                    load_only(*(getattr(ProductStock, name) for name in sorted(columns)))
+                )
+
             result = await session.execute(query)
             return result.scalar_one_or_none()
 
@@ -160,3 +225,37 @@ class ProductService:
             result = await session.execute(query)
             return list(result.scalars().all())
 
+    async def get_images_by_product_ids(
+        self,
+        product_stock_ids: list[UUID],
+    ) -> dict[UUID, list[ProductImage]]:
+        """
+        Get images for many products in a single batched query.
+
+        Avoids the N+1 pattern of calling get_images_by_product_id per
+        product by issuing one WHERE ... IN (...) query and grouping the
+        rows in Python.
+
+        Args:
+            product_stock_ids: UUIDs of ProductStock rows
+
+        Returns:
+            Dict mapping each product_stock_id to its list of ProductImage
+            instances (ids without images are simply absent)
+        """
+        if not product_stock_ids:
+            return {}
+
+        async with self.session_factory() as session:
+            query = select(ProductImage).where(
+                ProductImage.product_stock_id.in_(product_stock_ids)
+            )
+
+            result = await session.execute(query)
+
+            images_map: dict[UUID, list[ProductImage]] = defaultdict(list)
+            for img in result.scalars().all():
+                images_map[img.product_stock_id].append(img)
+
+            return dict(images_map)
+
@@ -4,8 +4,12 @@ Search Service for Business Backend.
 Orchestrates LLM with product search tool for semantic queries.
 """
 
+import asyncio
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 from loguru import logger
 
@@ -27,6 +31,12 @@ class SearchResult:
     query: str
 
 
+# Result cache bounds: repeated head queries skip the two LLM round-trips
+# entirely; the TTL keeps stock numbers from going stale.
+_RESULT_CACHE_MAX = 512
+_RESULT_CACHE_TTL = 60.0
+
+
 class SearchService:
     """Service for semantic search using LLM and product database."""
 
@@ -34,6 +44,8 @@ class SearchService:
 
 When a user asks about products or stock, use the product_search tool to find information in the database.
 
+Tool results are tab-separated values (TSV) with a header row; parse columns by tab.
+
 Always provide clear, concise answers about:
 - Whether the product exists
 - How many units are available
@@ -59,9 +71,17 @@ Respond in the same language as the user's query."""
         self.llm_provider = llm_provider
         self.product_service = product_service
         self.search_tool: ProductSearchTool | None = None
+        self._model_with_tools: BaseChatModel | None = None
+        self._result_cache: OrderedDict[str, tuple[float, SearchResult]] = OrderedDict()
+        # Queries currently being answered, so concurrent duplicates
+        # share one LLM round-trip instead of firing their own
+        self._inflight: dict[str, asyncio.Future[SearchResult]] = {}
 
         if llm_provider is not None:
             self.search_tool = create_product_search_tool(product_service)
+            # Bind once at construction: tool schemas never change, so
+            # per-request bind_tools() calls are pure overhead.
+            self._model_with_tools = llm_provider.bind_tools([self.search_tool])
 
     async def semantic_search(self, query: str) -> SearchResult:
         """
@@ -78,19 +98,52 @@ Respond in the same language as the user's query."""
             logger.warning("LLM not configured, using fallback search")
             return await self._fallback_search(query)
 
+        # Exact-match LRU in front of the LLM: two model round-trips plus
+        # a tool DB query collapse into a dict lookup for repeat queries
+        key = query.strip().lower()
+        cached = self._result_cache.get(key)
+        if cached is not None:
+            ts, result = cached
+            if time.monotonic() - ts < _RESULT_CACHE_TTL:
+                self._result_cache.move_to_end(key)
+                return result
+            del self._result_cache[key]
+
+        existing = self._inflight.get(key)
+        if existing is not None:
+            return await asyncio.shield(existing)
+
+        fut: asyncio.Future[SearchResult] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
         try:
-            return await self._llm_search(query)
-        except Exception as e:
-            logger.error(f"LLM search failed: {e}")
-            return await self._fallback_search(query)
+            try:
+                result = await self._llm_search(query)
+            except Exception as e:
+                logger.error("LLM search failed: {}", e)
+                result = await self._fallback_search(query)
+                fut.set_result(result)
+                return result
+
+            self._result_cache[key] = (time.monotonic(), result)
+            while len(self._result_cache) > _RESULT_CACHE_MAX:
+                self._result_cache.popitem(last=False)
+            fut.set_result(result)
+            return result
+        except BaseException:
+            # Wake followers; they re-raise CancelledError rather than
+            # hanging on a future that will never resolve
+            if not fut.done():
+                fut.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
 
     async def _llm_search(self, query: str) -> SearchResult:
         """Perform search using LLM with tool calling."""
-        assert self.llm_provider is not None
         assert self.search_tool is not None
+        assert self._model_with_tools is not None
 
-        # Bind tool to model
-        model_with_tools = self.llm_provider.bind_tools([self.search_tool])
+        model_with_tools = self._model_with_tools
 
         # Create messages
         messages = [
@@ -103,20 +156,21 @@ Respond in the same language as the user's query."""
 
         # Check if tool was called
         if hasattr(response, "tool_calls") and response.tool_calls:
-            # Execute tool calls
-            tool_messages = []
-            for tool_call in response.tool_calls:
-                if tool_call["name"] == "product_search":
-                    # Execute the search
-                    tool_result = await self.search_tool._arun(
-                        tool_call["args"]["search_term"]
-                    )
-                    tool_messages.append(
-                        ToolMessage(
-                            content=tool_result,
-                            tool_call_id=tool_call["id"],
-                        )
-                    )
+            # Execute independent tool calls concurrently: k searches
+            # cost one DB round-trip of latency instead of k
+            product_calls = [
+                tc for tc in response.tool_calls if tc["name"] == "product_search"
+            ]
+            tool_results = await asyncio.gather(
+                *(
+                    self.search_tool._arun(tc["args"]["search_term"])
+                    for tc in product_calls
+                )
+            )
+            tool_messages = [
+                ToolMessage(content=result, tool_call_id=tc["id"])
+                for tc, result in zip(product_calls, tool_results)
+            ]
 
             # Second LLM call with tool results
             messages_with_tools = [
@@ -18,6 +18,12 @@ from agent.domain.faq_data_models import (
 )
 
 
+# Parsed CSVs cached per tenant, keyed by file mtime: repeated reads are
+# a dict lookup, and editing a CSV on disk invalidates naturally.
+_faq_cache: dict[str, tuple[float, FAQData]] = {}
+_chunks_cache: dict[str, tuple[float, list[DocumentChunk]]] = {}
+
+
 class TenantDataService:
     """Service for loading tenant-specific data from CSV files."""
 
@@ -46,7 +52,12 @@ class TenantDataService:
         if not csv_path.exists():
             raise FileNotFoundError(f"FAQs CSV not found: {csv_path}")
 
-        logger.info(f"📖 Reading FAQs from: {csv_path}")
+        mtime = csv_path.stat().st_mtime
+        cached = _faq_cache.get(tenant)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        logger.info("📖 Reading FAQs from: {}", csv_path)
 
         df = pd.read_csv(csv_path)
 
@@ -103,9 +114,13 @@ class TenantDataService:
         )
 
         logger.info(
-            f"✅ Loaded FAQs for tenant '{tenant}': {len(faq_data.faq_items)} items, {len(faq_data.greeting_patterns)} greetings"
+            "✅ Loaded FAQs for tenant '{}': {} items, {} greetings",
+            tenant,
+            len(faq_data.faq_items),
+            len(faq_data.greeting_patterns),
         )
 
+        _faq_cache[tenant] = (mtime, faq_data)
         return faq_data
 
     @staticmethod
@@ -132,7 +147,12 @@ class TenantDataService:
         if not csv_path.exists():
             raise FileNotFoundError(f"Chunks CSV not found: {csv_path}")
 
-        logger.info(f"📖 Reading chunks from: {csv_path}")
+        mtime = csv_path.stat().st_mtime
+        cached = _chunks_cache.get(tenant)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        logger.info("📖 Reading chunks from: {}", csv_path)
 
         df = pd.read_csv(csv_path)
 
@@ -146,6 +166,7 @@ class TenantDataService:
             )
             chunks.append(chunk)
 
-        logger.info(f"✅ Loaded {len(chunks)} chunks for tenant '{tenant}'")
+        logger.info("✅ Loaded {} chunks for tenant '{}'", len(chunks), tenant)
 
+        _chunks_cache[tenant] = (mtime, chunks)
         return chunks